@@ -5,7 +5,7 @@ Creates the SQLite database with Customers and Tickets tables
 
 import sqlite3
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 
 import os
 # Database path in project root
@@ -13,6 +13,10 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 DB_PATH = os.path.join(PROJECT_ROOT, "customer_service.db")
 
+def _now_iso():
+    """Current UTC time in the ISO 8601 form the MCP server writes, so timestamps sort uniformly"""
+    return datetime.now(timezone.utc).isoformat()
+
 def setup_database():
     """Initialize the database with required tables"""
     # Remove existing database if it exists (for fresh start)
@@ -62,7 +66,7 @@ def setup_database():
         cursor.execute("""
             INSERT INTO customers (id, name, email, phone, status, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (*customer, datetime.now(), datetime.now()))
+        """, (*customer, _now_iso(), _now_iso()))
     
     # Insert sample tickets
     sample_tickets = [
@@ -77,7 +81,7 @@ def setup_database():
         cursor.execute("""
             INSERT INTO tickets (customer_id, issue, status, priority, created_at)
             VALUES (?, ?, ?, ?, ?)
-        """, (*ticket, datetime.now()))
+        """, (*ticket, _now_iso()))
     
     conn.commit()
     conn.close()
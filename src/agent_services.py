@@ -64,7 +64,7 @@ async def customer_data_process(message: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@customer_data_app.get("/health")
+@customer_data_app.api_route("/health", methods=["GET", "HEAD"])
 async def customer_data_health():
     return {"status": "healthy", "agent": "customer_data"}
 
@@ -94,7 +94,7 @@ async def support_process(message: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@support_app.get("/health")
+@support_app.api_route("/health", methods=["GET", "HEAD"])
 async def support_health():
     return {"status": "healthy", "agent": "support"}
 
@@ -116,7 +116,7 @@ async def router_query(query: dict):
     return result
 
 
-@router_app.get("/health")
+@router_app.api_route("/health", methods=["GET", "HEAD"])
 async def router_health():
     return {"status": "healthy", "agent": "router"}
 
@@ -6,6 +6,7 @@ Replaces direct database access with proper MCP protocol calls
 
 import requests
 import json
+import threading
 from typing import Dict, Any, List, Optional
 import logging
 
@@ -19,11 +20,14 @@ class MCPHTTPClient:
         self.mcp_server_url = mcp_server_url
         self.session_id: Optional[str] = None
         self.request_id = 0
+        # One client may be shared across threads; guards request_id and session_id
+        self._lock = threading.Lock()
     
     def _get_request_id(self) -> int:
         """Get next request ID"""
-        self.request_id += 1
-        return self.request_id
+        with self._lock:
+            self.request_id += 1
+            return self.request_id
     
     def _call_mcp(self, method: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Make MCP protocol call"""
@@ -57,20 +61,18 @@ class MCPHTTPClient:
                 result = response.json()
             elif 'text/event-stream' in content_type:
                 # Fallback: Parse SSE format if server still returns it
-                text = response.text
-                lines = text.strip().split('\n')
-                for line in lines:
+                # Match the field prefix on raw bytes; json.loads decodes only the payload
+                for line in response.content.split(b'\n'):
                     line = line.strip()
-                    if line.startswith('data: '):
-                        json_str = line[6:]  # Remove "data: " prefix
+                    if line.startswith(b'data: '):
                         try:
-                            result = json.loads(json_str)
+                            result = json.loads(line[6:])  # Skip "data: " prefix
                             break
                         except json.JSONDecodeError as e:
-                            logger.warning(f"Failed to parse SSE JSON: {e}, line: {line[:100]}")
+                            logger.warning(f"Failed to parse SSE JSON: {e}, line: {line[:100]!r}")
                             continue
                 else:
-                    raise Exception(f"No valid data found in SSE response. Response: {text[:200]}")
+                    raise Exception(f"No valid data found in SSE response. Response: {response.text[:200]}")
             else:
                 # Try to parse as JSON anyway
                 try:
@@ -78,9 +80,12 @@ class MCPHTTPClient:
                 except:
                     raise Exception(f"Unexpected content type: {content_type}. Response: {response.text[:200]}")
             
-            # Extract session ID from response headers
+            # Extract session ID from response headers; the first one issued wins so
+            # concurrent first calls don't keep swapping the client between sessions
             if "Mcp-Session-Id" in response.headers:
-                self.session_id = response.headers["Mcp-Session-Id"]
+                with self._lock:
+                    if self.session_id is None:
+                        self.session_id = response.headers["Mcp-Session-Id"]
             
             if "error" in result:
                 raise Exception(f"MCP Error: {result['error'].get('message', 'Unknown error')}")
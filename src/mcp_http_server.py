@@ -7,15 +7,17 @@ Compatible with MCP Inspector and other MCP clients
 
 import asyncio
 import json
+import secrets
 import sqlite3
-import uuid
+import time
 from typing import Any, Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 
 from fastapi import FastAPI, HTTPException, Header, Request
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import Response, StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+import orjson
 import uvicorn
 
 # Database path relative to project root
@@ -33,7 +35,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Session management
+# Column order used when turning customer rows into dicts
+CUSTOMER_COLUMNS = ("id", "name", "email", "phone", "status", "created_at", "updated_at")
+_LIST_CUSTOMERS_SQL = f"SELECT {', '.join(CUSTOMER_COLUMNS)} FROM customers WHERE status = ? LIMIT ?"
+
+# Session management (created_at is a time.monotonic() reading; nothing reads it back yet)
 sessions: Dict[str, Dict[str, Any]] = {}
 
 
@@ -42,6 +48,16 @@ def get_db_connection():
     return sqlite3.connect(DB_PATH)
 
 
+def _new_session_id() -> str:
+    """Generate a random session ID for the Mcp-Session-Id header"""
+    return secrets.token_hex(16)
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO 8601 string, ready to bind as a sqlite parameter"""
+    return datetime.now(timezone.utc).isoformat()
+
+
 def get_tools_list() -> List[Dict[str, Any]]:
     """Get list of available MCP tools"""
     return [
@@ -142,6 +158,38 @@ def get_tools_list() -> List[Dict[str, Any]]:
     ]
 
 
+# Static JSON-RPC results, built once at import instead of per request
+_TOOLS_LIST_RESULT = {"tools": get_tools_list()}
+_INITIALIZE_RESULT = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {
+        "tools": {}
+    },
+    "serverInfo": {
+        "name": "customer-service-mcp",
+        "version": "1.0.0"
+    }
+}
+
+# Pre-serialized envelopes for the static methods; only the request id is spliced in
+_ID_PLACEHOLDER = b'"__ID__"'
+
+
+def _static_envelope(result: Dict[str, Any]) -> bytes:
+    """Serialize a JSON-RPC success envelope with a placeholder id"""
+    envelope = {"jsonrpc": "2.0", "id": "__ID__", "result": result}
+    return orjson.dumps(envelope)
+
+
+_TOOLS_LIST_BODY = _static_envelope(_TOOLS_LIST_RESULT)
+_INITIALIZE_BODY = _static_envelope(_INITIALIZE_RESULT)
+
+
+def _render_static(template: bytes, request_id: Any) -> bytes:
+    """Fill the request id into a pre-serialized envelope"""
+    return template.replace(_ID_PLACEHOLDER, orjson.dumps(request_id), 1)
+
+
 async def call_tool(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
     """Handle tool calls"""
     try:
@@ -170,25 +218,15 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         
         elif name == "list_customers":
             status = arguments["status"]
-            limit = arguments.get("limit", 100)
+            # Clients often send numbers as strings; the SQL LIMIT bounds the rows
+            limit = int(arguments.get("limit", 100))
             conn = get_db_connection()
-            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM customers WHERE status = ? LIMIT ?", (status, limit))
+            cursor.execute(_LIST_CUSTOMERS_SQL, (status, limit))
             rows = cursor.fetchall()
             conn.close()
             
-            customers = []
-            for row in rows:
-                customers.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "email": row[2],
-                    "phone": row[3],
-                    "status": row[4],
-                    "created_at": row[5],
-                    "updated_at": row[6]
-                })
+            customers = [dict(zip(CUSTOMER_COLUMNS, row)) for row in rows]
             return {"success": True, "result": customers}
         
         elif name == "update_customer":
@@ -209,7 +247,7 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
                 conn.close()
                 return {"success": False, "error": "No valid fields to update"}
             
-            values.append(datetime.now())  # updated_at
+            values.append(_now_iso())  # updated_at
             values.append(customer_id)
             updates.append("updated_at = ?")
             
@@ -228,7 +266,7 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO tickets (customer_id, issue, status, priority, created_at) VALUES (?, ?, ?, ?, ?)",
-                (customer_id, issue, "open", priority, datetime.now())
+                (customer_id, issue, "open", priority, _now_iso())
             )
             ticket_id = cursor.lastrowid
             conn.commit()
@@ -281,12 +319,12 @@ async def mcp_stream_endpoint(
     """
     # Create or retrieve session
     if not mcp_session_id:
-        mcp_session_id = str(uuid.uuid4())
+        mcp_session_id = _new_session_id()
     
     if mcp_session_id not in sessions:
         sessions[mcp_session_id] = {
             "id": mcp_session_id,
-            "created_at": datetime.now().isoformat(),
+            "created_at": time.monotonic(),
             "messages": []
         }
     
@@ -327,32 +365,46 @@ async def mcp_endpoint(
     """
     # Create or retrieve session
     if not mcp_session_id:
-        mcp_session_id = str(uuid.uuid4())
+        mcp_session_id = _new_session_id()
     
     if mcp_session_id not in sessions:
         sessions[mcp_session_id] = {
             "id": mcp_session_id,
-            "created_at": datetime.now().isoformat(),
+            "created_at": time.monotonic(),
             "messages": []
         }
     
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        return JSONResponse(
+            content={
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32700,
+                    "message": f"Parse error: {e}"
+                }
+            },
+            headers={"Mcp-Session-Id": mcp_session_id},
+            status_code=400
+        )
+    
+    try:
         method = body.get("method")
         params = body.get("params", {})
         request_id = body.get("id")
         
         response_data = None
+        static_body = None
         
         if method == "tools/list":
-            tools = get_tools_list()
             response_data = {
                 "jsonrpc": "2.0",
                 "id": request_id,
-                "result": {
-                    "tools": tools
-                }
+                "result": _TOOLS_LIST_RESULT
             }
+            static_body = _TOOLS_LIST_BODY
         
         elif method == "tools/call":
             tool_name = params.get("name")
@@ -387,17 +439,9 @@ async def mcp_endpoint(
             response_data = {
                 "jsonrpc": "2.0",
                 "id": request_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {}
-                    },
-                    "serverInfo": {
-                        "name": "customer-service-mcp",
-                        "version": "1.0.0"
-                    }
-                }
+                "result": _INITIALIZE_RESULT
             }
+            static_body = _INITIALIZE_BODY
         
         else:
             response_data = {
@@ -413,6 +457,13 @@ async def mcp_endpoint(
         if response_data:
             sessions[mcp_session_id]["messages"].append(response_data)
         
+        if static_body is not None:
+            return Response(
+                content=_render_static(static_body, request_id),
+                media_type="application/json",
+                headers={"Mcp-Session-Id": mcp_session_id}
+            )
+        
         # Return JSON response directly (not SSE) for MCP Inspector compatibility
         return JSONResponse(
             content=response_data if response_data else {
@@ -429,7 +480,7 @@ async def mcp_endpoint(
     except Exception as e:
         error_response = {
             "jsonrpc": "2.0",
-            "id": body.get("id", None) if 'body' in locals() else None,
+            "id": body.get("id") if isinstance(body, dict) else None,
             "error": {
                 "code": -32603,
                 "message": str(e)
@@ -448,14 +499,18 @@ async def mcp_endpoint(
 @app.get("/tools/list")
 async def tools_list_endpoint():
     """Direct endpoint for listing tools (for testing)"""
-    return JSONResponse(content={"tools": get_tools_list()})
+    return JSONResponse(content=_TOOLS_LIST_RESULT)
 
 
 @app.post("/tools/call")
 async def tools_call_endpoint(request: Request):
     """Direct endpoint for calling tools (for testing)"""
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    
+    try:
         tool_name = body.get("name")
         arguments = body.get("arguments", {})
         
@@ -465,10 +520,14 @@ async def tools_call_endpoint(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/health")
+# The health body never changes, so serialize it once at import
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "mcp-server"})
+
+
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "mcp-server"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -479,6 +538,6 @@ if __name__ == "__main__":
     print("Direct Endpoints:")
     print("  GET /tools/list - List available tools")
     print("  POST /tools/call - Call a tool directly")
-    print("  GET /health - Health check")
+    print("  GET/HEAD /health - Health check")
     uvicorn.run(app, host="0.0.0.0", port=8003)
 
@@ -5,11 +5,15 @@ Provides streaming HTTP endpoints for customer queries
 """
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import json
+import orjson
 import asyncio
-from typing import Optional
+import threading
+from typing import Any, Dict, Optional
+from cachetools import TTLCache
 import uvicorn
 
 try:
@@ -47,15 +51,68 @@ customer_data_agent = CustomerDataAgent()
 support_agent = SupportAgent()
 router_agent = RouterAgent(customer_data_agent, support_agent)
 
+# Short-lived cache of router results keyed on normalized query text.
+# Queries that may write data (updates, ticket creation) always bypass it and
+# clear it once they finish. Writes made directly through the MCP server's
+# tools/call endpoint are not seen here, so those can be served stale for up
+# to QUERY_CACHE_TTL seconds.
+QUERY_CACHE_TTL = 60
+_query_cache = TTLCache(maxsize=1024, ttl=QUERY_CACHE_TTL)
+_query_cache_lock = threading.Lock()
+# Bumped on every invalidation so a read that started before a write can't store its result after it
+_query_cache_generation = 0
+_NON_IDEMPOTENT_WORDS = ("update", "change", "modify", "create")
+
+
+def _is_write_query(query: str) -> bool:
+    """Whether a query may write data and so must not be cached"""
+    key = query.lower()
+    return any(word in key for word in _NON_IDEMPOTENT_WORDS)
+
+
+def invalidate_query_cache() -> None:
+    """Drop every cached router result"""
+    global _query_cache_generation
+    with _query_cache_lock:
+        _query_cache.clear()
+        _query_cache_generation += 1
+
+
+def process_query_cached(query: str) -> Dict[str, Any]:
+    """Process a query through the router, reusing recent results for read-only queries"""
+    if _is_write_query(query):
+        try:
+            return router_agent.process_query(query)
+        finally:
+            # Even a failed write may have changed something, so always invalidate
+            invalidate_query_cache()
+    
+    key = query.strip().lower()
+    with _query_cache_lock:
+        result = _query_cache.get(key)
+        generation = _query_cache_generation
+    if result is None:
+        result = router_agent.process_query(query)
+        # Only successful results are worth replaying
+        if result.get('success'):
+            with _query_cache_lock:
+                if generation == _query_cache_generation:
+                    _query_cache[key] = result
+    return result
+
 
-def stream_agent_response(query: str):
-    """Generator function to stream agent responses"""
+async def stream_agent_response(query: str):
+    """Async generator to stream agent responses
+    
+    The router call is blocking, so it runs in the threadpool and the event
+    loop stays free to serve other streams while the agents work.
+    """
     try:
         # Yield initial status
         yield f"data: {json.dumps({'status': 'processing', 'message': 'Analyzing query...'})}\n\n"
         
         # Process query through router
-        result = router_agent.process_query(query)
+        result = await run_in_threadpool(process_query_cached, query)
         
         # Stream coordination log entries
         if result.get('coordination_log'):
@@ -84,7 +141,7 @@ async def root():
         "endpoints": {
             "/query": "POST - Submit customer query (streaming)",
             "/query/sync": "POST - Submit customer query (synchronous)",
-            "/health": "GET - Health check"
+            "/health": "GET/HEAD - Health check"
         }
     }
 
@@ -121,6 +178,8 @@ async def query_sync(query: dict):
         if LANGGRAPH_AVAILABLE and langgraph_coordinator is not None:
             try:
                 result = langgraph_coordinator.coordinate(customer_query)
+                if _is_write_query(customer_query):
+                    invalidate_query_cache()
                 return {
                     "query": customer_query,
                     "result": result,
@@ -131,7 +190,7 @@ async def query_sync(query: dict):
                 logger = logging.getLogger(__name__)
                 logger.warning(f"LangGraph coordinator failed, falling back to RouterAgent: {e}")
                 # Fallback to router agent if LangGraph fails
-                result = router_agent.process_query(customer_query)
+                result = process_query_cached(customer_query)
                 return {
                     "query": customer_query,
                     "result": result,
@@ -139,7 +198,7 @@ async def query_sync(query: dict):
                 }
         else:
             # Use RouterAgent directly
-            result = router_agent.process_query(customer_query)
+            result = process_query_cached(customer_query)
             return {
                 "query": customer_query,
                 "result": result,
@@ -152,19 +211,24 @@ async def query_sync(query: dict):
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
 
-@app.get("/health")
+# LANGGRAPH_AVAILABLE is fixed at import, so the health body can be serialized once
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "Multi-Agent Customer Service System",
+    "agents": {
+        "router": "active",
+        "customer_data": "active",
+        "support": "active"
+    },
+    "a2a_framework": "LangGraph SDK" if LANGGRAPH_AVAILABLE else "Custom A2A",
+    "mcp_transport": "Streamable HTTP (SSE)"
+})
+
+
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "agents": {
-            "router": "active",
-            "customer_data": "active",
-            "support": "active"
-        },
-        "a2a_framework": "LangGraph SDK" if LANGGRAPH_AVAILABLE else "Custom A2A",
-        "mcp_transport": "Streamable HTTP (SSE)"
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/agents")
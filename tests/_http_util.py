@@ -0,0 +1,112 @@
+"""
+Shared HTTP helpers for the test scripts
+One pooled session, JSON codecs, and the SSE reader used by test_http.py and validate_pipeline.py
+"""
+
+import json
+from contextlib import contextmanager
+from typing import Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Prefer orjson's C codecs; fall back to the stdlib when it isn't installed.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both.
+try:
+    from orjson import dumps, loads
+except ImportError:
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Shared session so every test reuses keep-alive connections;
+# pool_block waits for a free connection instead of opening throwaway extras
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0, pool_block=True))
+
+def ellip(text: str, limit: int = 70) -> str:
+    """Truncate text to limit characters, marking the cut with '...'"""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+def probe(url: str, timeout=(1.0, 2.0)) -> requests.Response:
+    """HEAD a URL for its status alone, retrying as GET if the server rejects HEAD"""
+    response = SESSION.head(url, timeout=timeout, allow_redirects=False)
+    if response.status_code == 405:
+        response = SESSION.get(url, timeout=timeout)
+    return response
+
+def _json_result(response: requests.Response) -> Tuple[requests.Response, Optional[Any]]:
+    """Pair a response with its decoded body, or None for an HTTP error status"""
+    if response.status_code >= 400:
+        return response, None
+    return response, loads(response.content)
+
+def get_json(url: str, timeout=(1.0, 5.0)) -> Tuple[requests.Response, Optional[Any]]:
+    """GET a JSON endpoint; returns (response, body), body None on an HTTP error status"""
+    return _json_result(SESSION.get(url, timeout=timeout))
+
+def post_json(url: str, body, timeout=(1.0, 5.0), headers=None) -> Tuple[requests.Response, Optional[Any]]:
+    """POST a JSON body; returns (response, body), body None on an HTTP error status
+
+    body may be pre-serialized bytes, which are sent as-is; anything else is encoded first.
+    """
+    data = body if isinstance(body, bytes) else dumps(body)
+    return _json_result(SESSION.post(url, data=data, headers=headers or JSON_HEADERS, timeout=timeout))
+
+# SSE data field prefix, matched on raw bytes so only the JSON payload is ever decoded
+_DATA_PREFIX = b"data: "
+_DATA_PREFIX_LEN = len(_DATA_PREFIX)
+# Hard cap on one SSE line so a runaway stream can't exhaust memory
+_MAX_LINE = 1 << 20
+
+def _iter_sse_payloads(response):
+    """Yield the payload of every `data:` field in a streamed SSE response as its line arrives"""
+    buffer = bytearray()
+    overlong = False
+    # chunk_size=None hands over each chunk as soon as it arrives instead of
+    # waiting to fill a fixed-size read, so events aren't held back
+    for chunk in response.iter_content(chunk_size=None):
+        # Only the new bytes can hold the next newline, so long lines aren't rescanned
+        search_from = len(buffer)
+        buffer.extend(chunk)
+        # Split off complete lines only; a partial line waits for the next chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", search_from)
+            if end < 0:
+                break
+            if overlong:
+                # This newline ends a line that was already dropped for being too long
+                overlong = False
+            elif end - start <= _MAX_LINE and buffer.startswith(_DATA_PREFIX, start, end):
+                # The trailing CR, if any, is JSON whitespace, so it can stay
+                yield buffer[start + _DATA_PREFIX_LEN:end]
+            start = search_from = end + 1
+        del buffer[:start]
+        if len(buffer) > _MAX_LINE:
+            # Drop a line longer than the cap instead of buffering all of it
+            buffer.clear()
+            overlong = True
+
+def _iter_sse_data(response):
+    """Yield each decoded SSE event as it arrives, skipping payloads that aren't JSON"""
+    for payload in _iter_sse_payloads(response):
+        try:
+            yield loads(payload)
+        except json.JSONDecodeError:
+            pass
+
+@contextmanager
+def stream_sse(url: str, body, timeout=(2.0, 30.0)):
+    """POST a JSON body to an SSE endpoint and yield (response, events)
+
+    events lazily decodes each `data:` payload; nothing is read if the caller
+    rejects the response status. The stream is closed on exit so its
+    connection goes back to the session pool.
+    """
+    data = body if isinstance(body, bytes) else dumps(body)
+    with SESSION.post(url, data=data, headers=JSON_HEADERS, stream=True, timeout=timeout) as response:
+        yield response, _iter_sse_data(response)
@@ -7,252 +7,204 @@ This demo can run in two modes:
 2. HTTP mode: Set A2A_USE_HTTP=true to use HTTP-based A2A communication
 """
 
+import io
 import sys
-import json
 import os
 import logging
-import sys
-import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-# Suppress verbose logging for cleaner output
-logging.getLogger().setLevel(logging.ERROR)
-logging.getLogger('src').setLevel(logging.ERROR)
-logging.getLogger('src.agents').setLevel(logging.ERROR)
-logging.getLogger('src.mcp_http_client').setLevel(logging.ERROR)
+# Suppress verbose logging for cleaner output (errors still get through)
+logging.disable(logging.WARNING)
 
-from scripts.setup_database import setup_database
+from scripts.setup_database import setup_database, DB_PATH
 from src.agents import RouterAgent, CustomerDataAgent, SupportAgent, MCPClient
 
+# Horizontal rules used by the printed report
+_DOUBLE_RULE = "═" * 80
+_RULE = "─" * 80
+
+# Written next to the database once it has been seeded
+_DB_READY_MARKER = os.path.join(os.path.dirname(DB_PATH), ".db_ready")
+
+# (summary name, section title, query, writes data) for every scenario the demo runs
+_SCENARIOS = [
+    # Required scenarios
+    ("Scenario 1: Task Allocation", "SCENARIO 1: Task Allocation",
+     "I need help with my account, customer ID 12345", False),
+    ("Scenario 2: Negotiation", "SCENARIO 2: Negotiation/Escalation",
+     "I want to cancel my subscription but I'm having billing issues", False),
+    ("Scenario 3: Multi-Step", "SCENARIO 3: Multi-Step Coordination",
+     "What's the status of all high-priority tickets for premium customers?", False),
+    
+    # Additional test scenarios
+    ("Simple Query", "ADDITIONAL TEST: Simple Query",
+     "Get customer information for ID 5", False),
+    ("Coordinated Query", "ADDITIONAL TEST: Coordinated Query",
+     "I'm customer 12345 and need help upgrading my account", False),
+    ("Complex Query", "ADDITIONAL TEST: Complex Query",
+     "Show me all active customers who have open tickets", False),
+    ("Escalation", "ADDITIONAL TEST: Escalation",
+     "I've been charged twice, please refund immediately!", False),
+    # Multi-intent updates need a customer ID; this one writes customer 1's email
+    ("Multi-Intent", "ADDITIONAL TEST: Multi-Intent",
+     "I'm customer 1, update my email to new@email.com and show my ticket history", True),
+]
+
+def _write(text):
+    """Write a fully formatted block to stdout in a single call"""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+def format_section(title):
+    """Format a section header"""
+    return f"\n{_DOUBLE_RULE}\n  {title}\n{_DOUBLE_RULE}\n"
+
 def print_section(title):
     """Print a formatted section header"""
-    print("\n" + "═" * 80)
-    print(f"  {title}")
-    print("═" * 80)
+    _write(format_section(title))
 
-def print_result(result):
-    """Print a formatted result"""
-    print("\n" + "─" * 80)
-    print("RESULT")
-    print("─" * 80)
+def format_result(result):
+    """Format a result as one block of text"""
+    buf = io.StringIO()
+    w = buf.write
+    w("\n" + _RULE + "\n")
+    w("RESULT\n")
+    w(_RULE + "\n")
     
     # Query
     query = result.get('query', 'N/A')
-    print(f"\n📝 Query: {query}")
+    w(f"\n📝 Query: {query}\n")
     
     # Scenario
     scenario = result.get('scenario', 'N/A')
-    print(f"🎯 Scenario: {scenario}")
+    w(f"🎯 Scenario: {scenario}\n")
     
     # Success status
     success = result.get('success', False)
     status_icon = "✅" if success else "❌"
-    print(f"{status_icon} Success: {success}")
+    w(f"{status_icon} Success: {success}\n")
     
     # A2A Coordination Log
-    if result.get('coordination_log'):
-        print(f"\n🔄 A2A Coordination Steps ({len(result['coordination_log'])} steps):")
-        for i, log_entry in enumerate(result['coordination_log'], 1):
-            print(f"   {i}. {log_entry}")
+    coordination_log = result.get('coordination_log')
+    if coordination_log:
+        w(f"\n🔄 A2A Coordination Steps ({len(coordination_log)} steps):\n")
+        for i, log_entry in enumerate(coordination_log, 1):
+            w(f"   {i}. {log_entry}\n")
     
     # Final Response
-    if result.get('response'):
-        print(f"\n💬 Final Response:")
-        response = result['response']
+    response = result.get('response')
+    if response:
+        w(f"\n💬 Final Response:\n")
         # Format multi-line responses nicely
         if '\n' in response:
             for line in response.split('\n'):
-                print(f"   {line}")
+                w(f"   {line}\n")
         else:
-            print(f"   {response}")
+            w(f"   {response}\n")
     
     # Customer Info
-    if result.get('customer_info'):
-        customer = result['customer_info']
-        print(f"\n👤 Customer Information:")
-        print(f"   • ID: {customer.get('id')}")
-        print(f"   • Name: {customer.get('name')}")
-        print(f"   • Email: {customer.get('email')}")
-        print(f"   • Status: {customer.get('status')}")
+    customer = result.get('customer_info')
+    if customer:
+        w(f"\n👤 Customer Information:\n")
+        w(f"   • ID: {customer.get('id')}\n")
+        w(f"   • Name: {customer.get('name')}\n")
+        w(f"   • Email: {customer.get('email')}\n")
+        w(f"   • Status: {customer.get('status')}\n")
     
     # Statistics
-    if result.get('statistics'):
-        stats = result['statistics']
-        print(f"\n📊 Statistics:")
+    stats = result.get('statistics')
+    if stats:
+        w(f"\n📊 Statistics:\n")
         for key, value in stats.items():
-            print(f"   • {key.replace('_', ' ').title()}: {value}")
+            w(f"   • {key.replace('_', ' ').title()}: {value}\n")
     
     # Negotiation Details
-    if result.get('negotiation'):
-        neg = result['negotiation']
-        print(f"\n🤝 Negotiation Details:")
-        print(f"   • Support can handle: {neg.get('support_can_handle')}")
-        print(f"   • Context provided: {neg.get('context_provided')}")
-    
-    print("\n" + "─" * 80 + "\n")
-
-def test_scenario_1_task_allocation():
-    """Test Scenario 1: Task Allocation"""
-    print_section("SCENARIO 1: Task Allocation")
-    print("Query: 'I need help with my account, customer ID 12345'\n")
-    
-    # Initialize agents (they will create their own MCP clients)
-    customer_data_agent = CustomerDataAgent()
-    support_agent = SupportAgent()
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    # Process query
-    query = "I need help with my account, customer ID 12345"
-    result = router.process_query(query)
-    
-    print_result(result)
-    return result
-
-def test_scenario_2_negotiation():
-    """Test Scenario 2: Negotiation/Escalation"""
-    print_section("SCENARIO 2: Negotiation/Escalation")
-    print("Query: 'I want to cancel my subscription but I'm having billing issues'\n")
-    
-    # Initialize agents (they will create their own MCP clients)
-    customer_data_agent = CustomerDataAgent()
-    support_agent = SupportAgent()
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    # Process query
-    query = "I want to cancel my subscription but I'm having billing issues"
-    result = router.process_query(query)
-    
-    print_result(result)
-    return result
-
-def test_scenario_3_multi_step():
-    """Test Scenario 3: Multi-Step Coordination"""
-    print_section("SCENARIO 3: Multi-Step Coordination")
-    print("Query: 'What's the status of all high-priority tickets for premium customers?'\n")
-    
-    # Initialize agents (they will create their own MCP clients)
-    customer_data_agent = CustomerDataAgent()
-    support_agent = SupportAgent()
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    # Process query
-    query = "What's the status of all high-priority tickets for premium customers?"
-    result = router.process_query(query)
-    
-    print_result(result)
-    return result
-
-def test_simple_query():
-    """Test: Simple Query - Get customer information"""
-    print_section("ADDITIONAL TEST: Simple Query")
-    print("Query: 'Get customer information for ID 5'\n")
-    
-    mcp_client = MCPClient()
-    customer_data_agent = CustomerDataAgent(mcp_client)
-    support_agent = SupportAgent(mcp_client)
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    query = "Get customer information for ID 5"
-    result = router.process_query(query)
+    neg = result.get('negotiation')
+    if neg:
+        w(f"\n🤝 Negotiation Details:\n")
+        w(f"   • Support can handle: {neg.get('support_can_handle')}\n")
+        w(f"   • Context provided: {neg.get('context_provided')}\n")
     
-    print_result(result)
-    return result
+    w("\n" + _RULE + "\n\n")
+    return buf.getvalue()
 
-def test_coordinated_query():
-    """Test: Coordinated Query"""
-    print_section("ADDITIONAL TEST: Coordinated Query")
-    print("Query: 'I'm customer 12345 and need help upgrading my account'\n")
-    
-    mcp_client = MCPClient()
-    customer_data_agent = CustomerDataAgent(mcp_client)
-    support_agent = SupportAgent(mcp_client)
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    query = "I'm customer 12345 and need help upgrading my account"
-    result = router.process_query(query)
-    
-    print_result(result)
-    return result
-
-def test_complex_query():
-    """Test: Complex Query"""
-    print_section("ADDITIONAL TEST: Complex Query")
-    print("Query: 'Show me all active customers who have open tickets'\n")
-    
-    mcp_client = MCPClient()
-    customer_data_agent = CustomerDataAgent(mcp_client)
-    support_agent = SupportAgent(mcp_client)
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    query = "Show me all active customers who have open tickets"
-    result = router.process_query(query)
-    
-    print_result(result)
-    return result
-
-def test_escalation():
-    """Test: Escalation"""
-    print_section("ADDITIONAL TEST: Escalation")
-    print("Query: 'I've been charged twice, please refund immediately!'\n")
-    
-    mcp_client = MCPClient()
-    customer_data_agent = CustomerDataAgent(mcp_client)
-    support_agent = SupportAgent(mcp_client)
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    query = "I've been charged twice, please refund immediately!"
-    result = router.process_query(query)
-    
-    print_result(result)
-    return result
-
-def test_multi_intent():
-    """Test: Multi-Intent"""
-    print_section("ADDITIONAL TEST: Multi-Intent")
-    print("Query: 'Update my email to new@email.com and show my ticket history'\n")
-    
-    mcp_client = MCPClient()
-    customer_data_agent = CustomerDataAgent(mcp_client)
-    support_agent = SupportAgent(mcp_client)
-    router = RouterAgent(customer_data_agent, support_agent)
-    
-    # For this query, we need a customer ID
-    query = "I'm customer 1, update my email to new@email.com and show my ticket history"
+def print_result(result):
+    """Print a formatted result"""
+    _write(format_result(result))
+
+def _ensure_db():
+    """Set up the database unless an earlier run already did
+    
+    Set DEMO_FORCE_SETUP=1 to force a fresh database. Returns True if setup ran.
+    """
+    if (not os.environ.get("DEMO_FORCE_SETUP")
+            and os.path.exists(_DB_READY_MARKER) and os.path.exists(DB_PATH)):
+        return False
+    # Drop the marker first so a setup that fails halfway isn't mistaken for a seeded database
+    if os.path.exists(_DB_READY_MARKER):
+        os.remove(_DB_READY_MARKER)
+    setup_database()
+    with open(_DB_READY_MARKER, "w") as f:
+        f.write(str(time.time()))
+    return True
+
+def _build_router():
+    """Build the one MCP client and agent set every scenario shares
+    
+    The agents call the MCP server while initializing, so this runs from main()
+    after the database is ready rather than at import.
+    """
+    mcp = MCPClient()
+    return RouterAgent(CustomerDataAgent(mcp), SupportAgent(mcp))
+
+def _run_scenario(router, section, query):
+    """Run one scenario through the shared router; returns (result, formatted block)
+    
+    Nothing is printed here, so main() can emit the blocks in scenario order.
+    """
     result = router.process_query(query)
-    
-    print_result(result)
-    return result
+    block = format_section(section) + f"Query: '{query}'\n\n" + format_result(result)
+    return result, block
 
 def main():
     """Run all test scenarios"""
-    print("\n" + "═" * 80)
-    print("  MULTI-AGENT CUSTOMER SERVICE SYSTEM - END-TO-END DEMONSTRATION")
-    print("═" * 80)
+    print("\n".join((
+        "\n" + _DOUBLE_RULE,
+        "  MULTI-AGENT CUSTOMER SERVICE SYSTEM - END-TO-END DEMONSTRATION",
+        _DOUBLE_RULE,
+    )))
     
     # Setup database
     print("\n🔧 Setting up database...")
     try:
-        setup_database()
-        print("✅ Database setup complete!\n")
+        if _ensure_db():
+            print("✅ Database setup complete!\n")
+        else:
+            print("✅ Reusing existing database (set DEMO_FORCE_SETUP=1 to reset)\n")
     except Exception as e:
         print(f"❌ Error setting up database: {e}")
         return
     
-    results = []
-    
-    # Run all test scenarios
+    # Read-only scenarios run concurrently, so wall time is bounded by the slowest
+    # of them. Scenarios that write data run afterwards, one at a time, so no read
+    # sees a half-applied change. Blocks are printed in _SCENARIOS order either way.
     try:
-        # Required scenarios
-        results.append(("Scenario 1: Task Allocation", test_scenario_1_task_allocation()))
-        results.append(("Scenario 2: Negotiation", test_scenario_2_negotiation()))
-        results.append(("Scenario 3: Multi-Step", test_scenario_3_multi_step()))
+        router = _build_router()
+        with ThreadPoolExecutor(max_workers=len(_SCENARIOS)) as executor:
+            futures = {
+                name: executor.submit(_run_scenario, router, section, query)
+                for name, section, query, writes in _SCENARIOS
+                if not writes
+            }
+            outcomes = {name: future.result() for name, future in futures.items()}
         
-        # Additional test scenarios
-        results.append(("Simple Query", test_simple_query()))
-        results.append(("Coordinated Query", test_coordinated_query()))
-        results.append(("Complex Query", test_complex_query()))
-        results.append(("Escalation", test_escalation()))
-        results.append(("Multi-Intent", test_multi_intent()))
+        results = []
+        for name, section, query, writes in _SCENARIOS:
+            result, block = outcomes[name] if not writes else _run_scenario(router, section, query)
+            _write(block)
+            results.append((name, result))
         
     except Exception as e:
         print(f"\n✗ Error during testing: {e}")
@@ -266,19 +218,17 @@ def main():
     successful = sum(1 for _, r in results if r.get('success', False))
     total = len(results)
     
-    print(f"\n📈 Test Statistics:")
-    print(f"   • Total Tests: {total}")
-    print(f"   • Successful: {successful} ✅")
-    print(f"   • Failed: {total - successful}")
-    
-    print(f"\n📋 Test Results:")
-    for name, result in results:
-        status = "✅" if result.get('success', False) else "❌"
-        print(f"   {status} {name}")
-    
-    print("\n" + "═" * 80)
-    print("  🎉 DEMONSTRATION COMPLETE")
-    print("═" * 80 + "\n")
+    print("\n".join((
+        f"\n📈 Test Statistics:",
+        f"   • Total Tests: {total}",
+        f"   • Successful: {successful} ✅",
+        f"   • Failed: {total - successful}",
+        f"\n📋 Test Results:",
+        *(f"   {'✅' if result.get('success', False) else '❌'} {name}" for name, result in results),
+        "\n" + _DOUBLE_RULE,
+        "  🎉 DEMONSTRATION COMPLETE",
+        _DOUBLE_RULE + "\n",
+    )))
 
 if __name__ == "__main__":
     main()
@@ -3,10 +3,16 @@ Test script for HTTP server endpoints
 Tests the streaming and synchronous query endpoints
 """
 
-import requests
-import json
+import os
+import sys
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests._http_util import SESSION, ellip, loads, post_json, probe, stream_sse
 
 # Suppress verbose logging for cleaner output
 logging.getLogger().setLevel(logging.ERROR)
@@ -16,168 +22,193 @@ logging.getLogger('src.mcp_http_client').setLevel(logging.ERROR)
 
 BASE_URL = "http://localhost:8000"
 
-def test_health():
-    """Test health endpoint"""
-    print("\n" + "─" * 80)
-    print("🔍 Testing Health Endpoint")
-    print("─" * 80)
+# Horizontal rules used by the printed report
+_DOUBLE_RULE = "═" * 80
+_RULE = "─" * 80
+
+# Tests run concurrently; each report block goes out under this lock in one write
+_OUT_LOCK = threading.Lock()
+
+def _write_block(lines):
+    """Write a test's collected report lines to stdout as one block"""
+    text = "\n".join(lines) + "\n"
+    with _OUT_LOCK:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+def test_health(response):
+    """Test health endpoint using the response already fetched by check_server_running"""
+    out = ["\n" + _RULE, "🔍 Testing Health Endpoint", _RULE]
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
         if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Status: {response.status_code}")
-            print(f"   Service: {data.get('service', 'N/A')}")
-            print(f"   A2A Framework: {data.get('a2a_framework', 'N/A')}")
-            print(f"   MCP Transport: {data.get('mcp_transport', 'N/A')}")
+            data = loads(response.content)
+            out.append(f"✅ Status: {response.status_code}")
+            out.append(f"   Service: {data.get('service', 'N/A')}")
+            out.append(f"   A2A Framework: {data.get('a2a_framework', 'N/A')}")
+            out.append(f"   MCP Transport: {data.get('mcp_transport', 'N/A')}")
             return True
         else:
-            print(f"❌ Status: {response.status_code}")
+            out.append(f"❌ Status: {response.status_code}")
             return False
     except Exception as e:
-        print(f"❌ Error: {e}")
+        out.append(f"❌ Error: {e}")
         return False
+    finally:
+        _write_block(out)
 
 def test_sync_query(query: str):
-    """Test synchronous query endpoint"""
-    print("\n" + "─" * 80)
-    print(f"🔍 Testing Sync Query")
-    print("─" * 80)
-    print(f"📝 Query: {query[:70]}{'...' if len(query) > 70 else ''}")
+    """Test synchronous query endpoint
+    
+    Output is collected and printed in one call so concurrent runs don't interleave.
+    """
+    out = [
+        "\n" + _RULE,
+        f"🔍 Testing Sync Query",
+        _RULE,
+        f"📝 Query: {ellip(query)}",
+    ]
     try:
-        response = requests.post(
-            f"{BASE_URL}/query/sync",
-            json={"query": query},
-            timeout=30
-        )
+        response, data = post_json(f"{BASE_URL}/query/sync", {"query": query}, timeout=(2.0, 30.0))
         if response.status_code == 200:
-            result = response.json().get('result', {})
+            result = data.get('result', {})
             scenario = result.get('scenario', 'N/A')
             success = result.get('success', False)
             
-            print(f"✅ Status: {response.status_code}")
-            print(f"🎯 Scenario: {scenario}")
-            print(f"{'✅' if success else '❌'} Success: {success}")
+            out.append(f"✅ Status: {response.status_code}")
+            out.append(f"🎯 Scenario: {scenario}")
+            out.append(f"{'✅' if success else '❌'} Success: {success}")
             
-            if result.get('coordination_log'):
-                print(f"\n🔄 A2A Coordination Steps ({len(result['coordination_log'])} steps):")
-                for i, log_entry in enumerate(result['coordination_log'], 1):
-                    print(f"   {i}. {log_entry}")
+            coordination_log = result.get('coordination_log')
+            if coordination_log:
+                out.append(f"\n🔄 A2A Coordination Steps ({len(coordination_log)} steps):")
+                for i, log_entry in enumerate(coordination_log, 1):
+                    out.append(f"   {i}. {log_entry}")
             
-            if result.get('response'):
-                response_text = result['response']
-                print(f"\n💬 Response:")
+            response_text = result.get('response')
+            if response_text:
+                out.append(f"\n💬 Response:")
                 if '\n' in response_text:
                     for line in response_text.split('\n'):
-                        print(f"   {line}")
+                        out.append(f"   {line}")
                 else:
-                    print(f"   {response_text}")
+                    out.append(f"   {response_text}")
             
             # Return True only if HTTP is 200 AND query processing succeeded
             return success
         else:
-            print(f"❌ Status: {response.status_code}")
+            out.append(f"❌ Status: {response.status_code}")
             return False
     except Exception as e:
-        print(f"❌ Error: {e}")
+        out.append(f"❌ Error: {e}")
         return False
+    finally:
+        _write_block(out)
 
 def test_streaming_query(query: str):
-    """Test streaming query endpoint"""
-    print("\n" + "─" * 80)
-    print(f"🔍 Testing Streaming Query")
-    print("─" * 80)
-    print(f"📝 Query: {query[:70]}{'...' if len(query) > 70 else ''}")
+    """Test streaming query endpoint
+    
+    Events are collected and printed in one call once the stream ends, so a
+    concurrent run's output doesn't land in the middle of this one.
+    """
+    out = [
+        "\n" + _RULE,
+        f"🔍 Testing Streaming Query",
+        _RULE,
+        f"📝 Query: {ellip(query)}",
+    ]
     try:
-        response = requests.post(
-            f"{BASE_URL}/query",
-            json={"query": query},
-            stream=True,
-            timeout=30
-        )
-        if response.status_code == 200:
-            print(f"✅ Status: {response.status_code}")
-            print(f"\n📡 Streaming Response:")
-            print("─" * 80)
+        with stream_sse(f"{BASE_URL}/query", {"query": query}) as (response, events):
+            if response.status_code == 200:
+                out.append(f"✅ Status: {response.status_code}")
+                out.append(f"\n📡 Streaming Response:")
+                out.append(_RULE)
             
-            final_status = None
-            for line in response.iter_lines():
-                if line:
-                    line_str = line.decode('utf-8')
-                    if line_str.startswith('data: '):
-                        data_str = line_str[6:]  # Remove 'data: ' prefix
-                        try:
-                            data = json.loads(data_str)
-                            if data.get('type') == 'coordination':
-                                log = data.get('log', [])
-                                if log:
-                                    print(f"🔄 Coordination: {log[-1] if isinstance(log, list) else log}")
-                            elif data.get('type') == 'customer_info':
-                                customer = data.get('data', {})
-                                if customer:
-                                    print(f"👤 Customer: {customer.get('name', 'N/A')} (ID: {customer.get('id', 'N/A')})")
-                            elif data.get('type') == 'response':
-                                response_text = data.get('data', '')
-                                if response_text:
-                                    print(f"💬 Response: {response_text[:100]}{'...' if len(response_text) > 100 else ''}")
-                            elif data.get('status'):
-                                status = data.get('status')
-                                if status == 'complete':
-                                    final_status = data
-                                    print(f"✅ {status.capitalize()}: Success={data.get('success')}, Scenario={data.get('scenario', 'N/A')}")
-                                elif status == 'processing':
-                                    print(f"⏳ Processing: {data.get('message', '')}")
-                        except json.JSONDecodeError:
-                            pass
+                final_status = None
+                for data in events:
+                    event_type = data.get('type')
+                    status = data.get('status')
+                    if event_type == 'coordination':
+                        log = data.get('log')
+                        if log:
+                            out.append(f"🔄 Coordination: {log[-1] if isinstance(log, list) else log}")
+                    elif event_type == 'customer_info':
+                        customer = data.get('data')
+                        if customer:
+                            out.append(f"👤 Customer: {customer.get('name', 'N/A')} (ID: {customer.get('id', 'N/A')})")
+                    elif event_type == 'response':
+                        response_text = data.get('data')
+                        if response_text:
+                            out.append(f"💬 Response: {ellip(response_text, 100)}")
+                    elif status == 'complete':
+                        final_status = data
+                        out.append(f"✅ Complete: Success={data.get('success')}, Scenario={data.get('scenario', 'N/A')}")
+                    elif status == 'processing':
+                        out.append(f"⏳ Processing: {data.get('message', '')}")
             
-            print("─" * 80)
-            # Return True only if streaming succeeded AND query processing succeeded
-            return final_status is not None and final_status.get('success', False) if final_status else False
-        else:
-            print(f"❌ Status: {response.status_code}")
-            return False
+                out.append(_RULE)
+                # Return True only if streaming succeeded AND query processing succeeded
+                return final_status is not None and final_status.get('success', False) if final_status else False
+            else:
+                out.append(f"❌ Status: {response.status_code}")
+                return False
     except Exception as e:
-        print(f"❌ Error: {e}")
+        out.append(f"❌ Error: {e}")
         return False
+    finally:
+        _write_block(out)
 
 def check_server_running():
-    """Check if the correct server is running"""
+    """Check if the correct server is running
+    
+    Returns the /health response so the health test can reuse it, or None.
+    """
     try:
-        response = requests.get(f"{BASE_URL}/", timeout=2)
-        if response.status_code == 200:
-            data = response.json()
-            if "Multi-Agent Customer Service System" in str(data.get("service", "")):
-                return True
-        return False
+        response = SESSION.get(f"{BASE_URL}/health", timeout=(1.0, 2.0))
+        if response.ok and "Multi-Agent" in response.text:
+            return response
+        return None
     except:
-        return False
+        return None
+
+def _wait_for_server(deadline: float = 5.0):
+    """Poll check_server_running with exponential backoff until it succeeds or time runs out"""
+    start = time.monotonic()
+    delay = 0.05
+    while time.monotonic() - start < deadline:
+        response = check_server_running()
+        if response is not None:
+            return response
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+    return None
 
 def check_mcp_server():
     """Check if MCP server is running"""
     try:
-        response = requests.get("http://localhost:8003/health", timeout=2)
+        response = probe("http://localhost:8003/health")
         return response.status_code == 200
     except:
         return False
 
 def main():
     """Run all tests"""
-    print("\n" + "═" * 80)
+    print("\n" + _DOUBLE_RULE)
     print("  HTTP SERVER TEST SUITE")
-    print("═" * 80)
+    print(_DOUBLE_RULE)
     
     # Check if servers are running
-    main_server_ok = check_server_running()
+    health_response = check_server_running()
     mcp_server_ok = check_mcp_server()
     
-    if not main_server_ok:
+    if health_response is None:
         print("\n⚠️  WARNING: Main server doesn't appear to be running!")
         print("   Please start the server with: python -m src.server")
         print("   Or use: ./scripts/start_all_services.sh")
-        print("\n   Waiting 5 seconds for you to start the server...")
-        time.sleep(5)
+        print("\n   Waiting up to 5 seconds for you to start the server...")
         
-        # Check again
-        if not check_server_running():
+        # Poll until the server answers instead of always sleeping the full 5 seconds
+        health_response = _wait_for_server()
+        if health_response is None:
             print("\n❌ Main server still not responding. Please start the server and try again.")
             return
         else:
@@ -195,7 +226,7 @@ def main():
     results = []
     
     # Test health
-    results.append(("Health Check", test_health()))
+    results.append(("Health Check", test_health(health_response)))
     
     # Test scenarios
     test_queries = [
@@ -205,17 +236,17 @@ def main():
         "What's the status of all high-priority tickets for premium customers?",
     ]
     
-    for query in test_queries:
-        results.append((f"Sync: {query[:50]}...", test_sync_query(query)))
-        time.sleep(1)  # Small delay between requests
-    
-    # Test streaming
-    results.append(("Streaming: Simple query", test_streaming_query("Get customer information for ID 1")))
+    # The sync queries and the streaming test are independent, so issue them all
+    # concurrently over the pooled session; results keep submission order
+    with ThreadPoolExecutor(max_workers=len(test_queries) + 1) as executor:
+        futures = [(f"Sync: {query[:50]}...", executor.submit(test_sync_query, query)) for query in test_queries]
+        futures.append(("Streaming: Simple query", executor.submit(test_streaming_query, "Get customer information for ID 1")))
+        results.extend((name, future.result()) for name, future in futures)
     
     # Summary
-    print("\n" + "═" * 80)
+    print("\n" + _DOUBLE_RULE)
     print("  TEST SUMMARY")
-    print("═" * 80)
+    print(_DOUBLE_RULE)
     
     successful = sum(1 for _, result in results if result)
     total = len(results)
@@ -230,7 +261,7 @@ def main():
         status = "✅" if result else "❌"
         print(f"   {status} {name}")
     
-    print("\n" + "═" * 80 + "\n")
+    print("\n" + _DOUBLE_RULE + "\n")
 
 if __name__ == "__main__":
     main()
@@ -4,11 +4,17 @@ Pipeline Validation Script
 Tests MCP server, A2A agent cards, and end-to-end functionality
 """
 
-import requests
-import json
+import os
 import sys
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests._http_util import JSON_HEADERS, SESSION, dumps, get_json, loads, post_json, probe
 
 # Configuration
 MCP_SERVER_URL = "http://localhost:8003"
@@ -16,40 +22,53 @@ MAIN_SERVER_URL = "http://localhost:8000"
 CUSTOMER_DATA_URL = "http://localhost:8001"
 SUPPORT_URL = "http://localhost:8002"
 
+# Tools and agent cards the pipeline must expose
+REQUIRED_TOOLS = frozenset({"get_customer", "list_customers", "update_customer",
+                            "create_ticket", "get_customer_history"})
+REQUIRED_AGENTS = frozenset({"router_agent", "customer_data_agent", "support_agent"})
+
+# Horizontal rule used by print_header
+_HEADER_RULE = "=" * 80
+
+# JSON-RPC request bodies for test_mcp_protocol, serialized once at import
+_INITIALIZE_BODY = dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+_TOOLS_LIST_BODY = dumps({"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}})
+
 def print_header(text: str):
     """Print a formatted header"""
-    print("\n" + "=" * 80)
+    print("\n" + _HEADER_RULE)
     print(f"  {text}")
-    print("=" * 80)
+    print(_HEADER_RULE)
 
 def print_section(text: str):
     """Print a formatted section"""
     print(f"\n--- {text} ---")
 
-def check_service(url: str, name: str) -> bool:
-    """Check if a service is running"""
+def check_service(url: str, name: str) -> Tuple[bool, str]:
+    """Check if a service is running
+    
+    Returns (ok, message) instead of printing, so concurrent checks can be
+    reported from the main thread in a fixed order.
+    """
     try:
-        response = requests.get(f"{url}/health", timeout=2)
+        response = probe(f"{url}/health")
         if response.status_code == 200:
-            print(f"✅ {name} is running at {url}")
-            return True
+            return True, f"{name} is running at {url}"
         else:
-            print(f"❌ {name} returned status {response.status_code}")
-            return False
+            return False, f"{name} returned status {response.status_code}"
     except requests.exceptions.ConnectionError:
-        print(f"❌ {name} is not running at {url}")
-        return False
+        return False, f"{name} is not running at {url}"
     except Exception as e:
-        print(f"❌ Error checking {name}: {e}")
-        return False
+        return False, f"Error checking {name}: {e}"
 
 def test_mcp_tools_list() -> bool:
     """Test MCP tools/list endpoint"""
     print_section("Testing MCP tools/list")
     try:
-        response = requests.get(f"{MCP_SERVER_URL}/tools/list", timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        response, data = get_json(f"{MCP_SERVER_URL}/tools/list")
+        if data is None:
+            print(f"❌ HTTP {response.status_code}")
+            return False
         
         tools = data.get("tools", [])
         print(f"✅ Found {len(tools)} tools:")
@@ -57,13 +76,10 @@ def test_mcp_tools_list() -> bool:
             print(f"   - {tool.get('name')}: {tool.get('description', '')[:60]}...")
         
         # Validate required tools
-        required_tools = ["get_customer", "list_customers", "update_customer", 
-                         "create_ticket", "get_customer_history"]
-        found_tools = [t.get("name") for t in tools]
-        missing = [t for t in required_tools if t not in found_tools]
+        missing = REQUIRED_TOOLS.difference(t.get("name") for t in tools)
         
         if missing:
-            print(f"❌ Missing required tools: {missing}")
+            print(f"❌ Missing required tools: {sorted(missing)}")
             return False
         else:
             print("✅ All required tools present")
@@ -81,9 +97,10 @@ def test_mcp_tools_call() -> bool:
             "name": "get_customer",
             "arguments": {"customer_id": 1}
         }
-        response = requests.post(f"{MCP_SERVER_URL}/tools/call", json=payload, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        response, data = post_json(f"{MCP_SERVER_URL}/tools/call", payload)
+        if data is None:
+            print(f"❌ HTTP {response.status_code}")
+            return False
         
         if data.get("success"):
             result = data.get("result", {})
@@ -105,23 +122,19 @@ def test_mcp_protocol() -> bool:
     print_section("Testing MCP Protocol Endpoint")
     try:
         # Test initialize
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "initialize",
-            "params": {}
-        }
-        response = requests.post(f"{MCP_SERVER_URL}/mcp", json=payload, timeout=5)
-        response.raise_for_status()
+        response = SESSION.post(f"{MCP_SERVER_URL}/mcp", data=_INITIALIZE_BODY, headers=JSON_HEADERS, timeout=(1.0, 5.0))
+        if response.status_code >= 400:
+            print(f"❌ HTTP {response.status_code}")
+            return False
         
         # POST /mcp now returns JSON directly (not SSE)
         content_type = response.headers.get('Content-Type', '')
         if 'application/json' in content_type or 'text/json' in content_type:
-            data = response.json()
+            data = loads(response.content)
         else:
             # Fallback: try parsing as JSON anyway
             try:
-                data = response.json()
+                data = loads(response.content)
             except:
                 print(f"❌ Unexpected content type: {content_type}")
                 return False
@@ -135,18 +148,12 @@ def test_mcp_protocol() -> bool:
             print(f"❌ MCP initialize failed: {data}")
             return False
         
-        # Test tools/list via protocol
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/list",
-            "params": {}
-        }
-        response = requests.post(f"{MCP_SERVER_URL}/mcp", json=payload, timeout=5)
-        response.raise_for_status()
-        
-        # POST /mcp returns JSON directly
-        data = response.json()
+        # Test tools/list via protocol, continuing the session initialize opened
+        headers = {**JSON_HEADERS, "Mcp-Session-Id": session_id} if session_id else JSON_HEADERS
+        response, data = post_json(f"{MCP_SERVER_URL}/mcp", _TOOLS_LIST_BODY, headers=headers)
+        if data is None:
+            print(f"❌ HTTP {response.status_code}")
+            return False
         
         if "result" in data and "tools" in data["result"]:
             print(f"✅ MCP tools/list works: {len(data['result']['tools'])} tools")
@@ -156,25 +163,24 @@ def test_mcp_protocol() -> bool:
         
         return True
     except Exception as e:
-        print(f"❌ Error testing MCP protocol: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"❌ Error testing MCP protocol: {type(e).__name__}: {e}")
+        if os.environ.get("DEBUG_VALIDATE"):
+            import traceback
+            traceback.print_exc()
         return False
 
 def test_agent_cards() -> bool:
     """Test A2A agent cards"""
     print_section("Testing A2A Agent Cards")
     try:
-        response = requests.get(f"{MAIN_SERVER_URL}/agents", timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        response, data = get_json(f"{MAIN_SERVER_URL}/agents")
+        if data is None:
+            print(f"❌ HTTP {response.status_code}")
+            return False
         
         agents = data.get("agents", [])
         print(f"✅ Found {len(agents)} agents:")
         
-        required_agents = ["router_agent", "customer_data_agent", "support_agent"]
-        found_agent_ids = [a.get("agent_id") for a in agents]
-        
         for agent in agents:
             agent_id = agent.get("agent_id")
             name = agent.get("name")
@@ -184,9 +190,9 @@ def test_agent_cards() -> bool:
             print(f"     Capabilities: {', '.join(capabilities)}")
             print(f"     Tasks: {len(tasks)} tasks defined")
         
-        missing = [a for a in required_agents if a not in found_agent_ids]
+        missing = REQUIRED_AGENTS.difference(a.get("agent_id") for a in agents)
         if missing:
-            print(f"❌ Missing required agents: {missing}")
+            print(f"❌ Missing required agents: {sorted(missing)}")
             return False
         else:
             print("✅ All required agents present with agent cards")
@@ -201,9 +207,10 @@ def test_end_to_end_query() -> bool:
     try:
         # Test a simple query
         payload = {"query": "Get customer information for ID 1"}
-        response = requests.post(f"{MAIN_SERVER_URL}/query/sync", json=payload, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        response, data = post_json(f"{MAIN_SERVER_URL}/query/sync", payload, timeout=(2.0, 10.0))
+        if data is None:
+            print(f"❌ HTTP {response.status_code}")
+            return False
         
         result = data.get("result", {})
         if result.get("success"):
@@ -235,8 +242,22 @@ def main():
     
     # Check services
     print_header("Service Health Checks")
-    results.append(("MCP Server", check_service(MCP_SERVER_URL, "MCP Server")))
-    results.append(("Main Server", check_service(MAIN_SERVER_URL, "Main Server")))
+    # Probe every service at once so a down host costs one timeout, not one each.
+    # Only the MCP and main servers gate the run; the A2A agent services are reported
+    # for information because the router can run its agents in-process.
+    required = [(MCP_SERVER_URL, "MCP Server"), (MAIN_SERVER_URL, "Main Server")]
+    optional = [(CUSTOMER_DATA_URL, "Customer Data Agent"), (SUPPORT_URL, "Support Agent")]
+    with ThreadPoolExecutor(max_workers=len(required) + len(optional)) as executor:
+        futures = [(name, executor.submit(check_service, url, name)) for url, name in required + optional]
+        checks = [(name, future.result()) for name, future in futures]
+    for name, (ok, message) in checks[:len(required)]:
+        print(f"{'✅' if ok else '❌'} {message}")
+        results.append((name, ok))
+    for name, (ok, message) in checks[len(required):]:
+        if ok:
+            print(f"✅ {message}")
+        else:
+            print(f"⚠️  {message} (optional, only needed with A2A_USE_HTTP=true)")
     
     if not all([r[1] for r in results]):
         print("\n❌ Some services are not running. Please start them first:")